@@ -18,21 +18,110 @@ License:
 import os
 import sys
 import json
+import io
+import hashlib
+import zipfile
 import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
-from dataclasses import dataclass
-from PIL import Image
+from dataclasses import dataclass, field
+from PIL import Image, __version__ as PIL_VERSION
+
+try:
+    import oxipng  # pyoxipng: Rust PNG optimizer with SIMD deflate
+except ImportError:
+    oxipng = None
+
+
+def _encode_png(img: Image.Image) -> bytes:
+    """
+    Encode an image to optimized PNG bytes.
+
+    When the optional pyoxipng module is installed, the image is encoded
+    with Pillow's fastest compression setting and then recompressed by
+    oxipng, whose SIMD-accelerated deflate is much faster than Pillow's
+    optimize=True pass. Otherwise Pillow's optimizing encoder is used.
+
+    Encoding to memory means outputs that share a pixel size can reuse the
+    same encoded buffer instead of re-reading a freshly written file.
+
+    Args:
+        img: The image to encode
+
+    Returns:
+        The encoded PNG data
+    """
+    buffer = io.BytesIO()
+    if oxipng is not None:
+        img.save(buffer, "PNG", compress_level=1)
+        return oxipng.optimize_from_memory(
+            buffer.getvalue(), level=2, strip=oxipng.StripChunks.safe())
+    img.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _build_pyramid(img: Image.Image) -> dict:
+    """
+    Build a pyramid of progressively halved copies of the base image.
+
+    Lanczos cost scales with the number of source pixels, so small icons
+    are much cheaper to resize from a small base than from the full-size
+    image. Each level is half the size of the previous one, down to 32px.
+    Halving is an exact 2x box reduction, so levels are built with the
+    much cheaper reduce() kernel; the final sub-2x step to each target
+    still uses the configured high-quality filter.
+
+    Args:
+        img: The prepared base image
+
+    Returns:
+        A dict mapping size to the pyramid level of that size
+    """
+    pyramid = {img.width: img}
+    level = img
+    while level.width // 2 >= 32:
+        level = level.reduce(2)
+        pyramid[level.width] = level
+    return pyramid
+
+
+def _select_base(pyramid: dict, output_size: int) -> Image.Image:
+    """
+    Select the smallest pyramid level that is at least twice the target size.
+
+    Args:
+        pyramid: A pyramid built by _build_pyramid
+        output_size: The size being generated
+
+    Returns:
+        The pyramid level to resize from
+    """
+    candidates = [size for size in pyramid if size >= 2 * output_size]
+    base_size = min(candidates) if candidates else max(pyramid)
+    return pyramid[base_size]
 
 
 @dataclass
 class IconSpec:
     """Specification for an app icon."""
-    size: int
+    size: float
     filename: str
     idiom: str
     scale: str
     role: Optional[str] = None
     subgroup: Optional[str] = None
+    # Derived once at construction: px_size folds in the scale multiplier
+    # (the only float arithmetic, rounded exactly once) and size_str is the
+    # point-size label Xcode expects
+    px_size: int = field(init=False)
+    size_str: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        scale_factor = int(self.scale[0]) if self.scale[0].isdigit() else 1
+        self.px_size = round(self.size * scale_factor)
+        self.size_str = f"{self.size}x{self.size}"
 
 
 class AppIconGenerator:
@@ -66,29 +155,63 @@ class AppIconGenerator:
     APP_STORE_ICON = [
         IconSpec(1024, "appstore", "ios-marketing", "1x", "primary"),
     ]
-    
-    def __init__(self, input_path: str, output_dir: str, quality: str = "high"):
+
+    # Every target is statically known, so the (spec, pixel size, filename)
+    # triples are resolved once at import time rather than per run
+    ALL_SPECS = [
+        (icon, icon.px_size, f"{icon.filename}_{icon.px_size}x{icon.px_size}.png")
+        for icon in IPHONE_ICONS + IPAD_ICONS + APP_STORE_ICON
+    ]
+
+    def __init__(self, input_path: str, output_dir: str, quality: str = "high",
+                 zip_output: bool = False):
         """
         Initialize the AppIconGenerator.
-        
+
         Args:
             input_path: Path to the input image
             output_dir: Directory to save the generated icons
             quality: Quality of the resized images ('high', 'medium', or 'low')
+            zip_output: Bundle all outputs into a single zip archive instead
+                of individual files
         """
         self.input_path = input_path
         self.output_dir = output_dir
         self.quality = quality
+        self.zip_output = zip_output
         self.processed_count = 0
-        self.total_count = len(self.IPHONE_ICONS + self.IPAD_ICONS + self.APP_STORE_ICON)
         self.needs_upscaling = False
+        self._base_img: Optional[Image.Image] = None
+        self._pyramid: dict = {}
+        self._progress_lock = threading.Lock()
+        self._zip_file: Optional[zipfile.ZipFile] = None
+        self._zip_lock = threading.Lock()
+
+        # Resolve the resize filter once; quality never changes after init
+        quality_map = {
+            "high": Image.LANCZOS,
+            "medium": Image.BICUBIC,
+            "low": Image.BILINEAR
+        }
+        self._resize_filter = quality_map.get(quality.lower(), Image.LANCZOS)
+        self.total_count = len(self.ALL_SPECS)
         
+        # Pillow-SIMD releases carry a ".postN" version suffix; report when
+        # its SIMD-accelerated resample path is in use
+        if "post" in PIL_VERSION:
+            print(f"Using Pillow-SIMD {PIL_VERSION} (SIMD-accelerated resampling)")
+
         # Create output directory structure
         self.ios_dir = os.path.join(output_dir, "ios")
         os.makedirs(self.ios_dir, exist_ok=True)
         
         # Validate input image
         self._validate_input_image()
+
+        # Key the prepared-base disk cache to the input content so any
+        # edit to the source invalidates it automatically
+        with open(input_path, 'rb') as f:
+            self._cache_key = hashlib.sha256(f.read()).hexdigest()[:16]
     
     def _validate_input_image(self) -> None:
         """
@@ -115,72 +238,101 @@ class AppIconGenerator:
             else:
                 self.needs_upscaling = False
     
-    def _get_resize_method(self) -> int:
+    def _report_created(self, output_size: int, output_path: str) -> None:
         """
-        Get the appropriate resize method based on the quality setting.
-        
-        Returns:
-            The PIL resize filter to use
+        Update the progress counter and report a newly created icon.
+
+        Thread-safe: the counter is the only state shared between worker
+        threads.
+
+        Args:
+            output_size: The pixel size of the created icon
+            output_path: The path of the created icon
         """
-        quality_map = {
-            "high": Image.LANCZOS,
-            "medium": Image.BICUBIC,
-            "low": Image.BILINEAR
-        }
-        return quality_map.get(self.quality.lower(), Image.LANCZOS)
-    
-    def _process_image(self, img: Image.Image, output_size: int, output_path: str) -> None:
+        with self._progress_lock:
+            self.processed_count += 1
+            progress = (self.processed_count / self.total_count) * 100
+            print(f"[{progress:.1f}%] Created: {output_path} ({output_size}x{output_size})")
+
+    def _process_image(self, output_size: int, output_paths: list) -> None:
         """
-        Process and save an image at the specified size.
-        
+        Resize, encode and save all outputs of one pixel size.
+
         Args:
-            img: The source image
             output_size: The size to resize to
-            output_path: Where to save the resized image
+            output_paths: The paths to write; all receive the same encoded
+                bytes
         """
-        # Resize the image
-        resize_method = self._get_resize_method()
-        resized_img = img.resize((output_size, output_size), resize_method)
-        
-        # Save the resized image
-        resized_img.save(output_path, "PNG", optimize=True)
-        
-        # Update progress
-        self.processed_count += 1
-        progress = (self.processed_count / self.total_count) * 100
-        print(f"[{progress:.1f}%] Created: {output_path} ({output_size}x{output_size})")
-    
-    def _upscale_image(self, img: Image.Image, target_size: int = 1024) -> Image.Image:
+        base = _select_base(self._pyramid, output_size)
+        if base.width == output_size and base.height == output_size:
+            # Already at the target size (common for the 1024 App Store
+            # icon with a 1024 source); skip the resample entirely
+            resized_img = base
+        else:
+            # Always use LANCZOS for upscaling as it provides the best quality
+            resize_filter = Image.LANCZOS if output_size > base.width else self._resize_filter
+            resized_img = base.resize((output_size, output_size), resize_filter)
+
+        png_bytes = _encode_png(resized_img)
+        for output_path in output_paths:
+            self._write_output(output_path, png_bytes)
+            self._report_created(output_size, output_path)
+
+    def _write_output(self, output_path: str, data: bytes) -> None:
         """
-        Upscale an image to the target size using the high-quality resize method.
-        
+        Write encoded output bytes to disk or into the zip bundle.
+
         Args:
-            img: The source image to upscale
-            target_size: The target size (width and height) for the upscaled image
-            
-        Returns:
-            The upscaled image
+            output_path: The path the output would have on disk; in zip mode
+                it becomes the archive member name relative to the output dir
+            data: The encoded file contents
         """
-        current_size = img.width  # Image is already square at this point
-        if current_size >= target_size:
-            return img
-            
-        print(f"Upscaling image from {current_size}x{current_size} to {target_size}x{target_size}...")
-        # Always use LANCZOS for upscaling as it provides the best quality
-        return img.resize((target_size, target_size), Image.LANCZOS)
-    
+        if self._zip_file is not None:
+            arcname = os.path.relpath(output_path, self.output_dir)
+            # ZipFile.writestr is not safe for concurrent writers
+            with self._zip_lock:
+                self._zip_file.writestr(arcname, data)
+        else:
+            with open(output_path, 'wb') as f:
+                f.write(data)
+
     def _prepare_image(self) -> Image.Image:
         """
         Prepare the input image for processing.
-        
+
+        The prepared image is cached on the instance so the source file is
+        only opened and decoded once, no matter how many times icons are
+        generated.
+
+        Sources smaller than 1024 are kept at their native resolution;
+        upscaling to an intermediate 1024 and then downscaling again would
+        touch far more pixels than resizing each target directly, so
+        targets larger than the source are upscaled in a single step in
+        _process_image instead.
+
         Returns:
-            A square version of the input image, upscaled if necessary
+            A square version of the input image
         """
+        if self._base_img is not None:
+            return self._base_img
+
+        # Repeated runs with an unchanged source reuse the prepared base
+        # from disk and skip the decode, convert and crop entirely
+        cache_path = os.path.join(self.output_dir, ".cache",
+                                  f"base_{self._cache_key}.png")
+        if os.path.isfile(cache_path):
+            with Image.open(cache_path) as cached:
+                self._base_img = cached.copy()
+            return self._base_img
+
         with Image.open(self.input_path) as img:
-            # Convert to RGB if needed
-            if img.mode not in ('RGB', 'RGBA'):
+            source = img
+
+            # Force a single canonical 4-channel layout so every downstream
+            # resize and save works on the same RGBA buffer format
+            if img.mode != 'RGBA':
                 img = img.convert('RGBA')
-            
+
             # Check if image is square
             if img.width != img.height:
                 print(f"Warning: Input image is not square ({img.width}x{img.height}). Icons should be square.")
@@ -191,14 +343,18 @@ class AppIconGenerator:
                 right = left + min_dimension
                 bottom = top + min_dimension
                 img = img.crop((left, top, right, bottom))
-            
-            # Create a copy to work with
-            processed_img = img.copy()
-            
-            # Upscale if needed
-            if self.needs_upscaling:
-                processed_img = self._upscale_image(processed_img)
-                
+
+            # Detach from the file handle before it closes. Convert and crop
+            # already materialize a fresh contiguous buffer, so only copy the
+            # pixels when neither operation ran.
+            processed_img = img.copy() if img is source else img
+
+            # Persist the prepared base for the next run; a low compression
+            # level keeps the write cheap
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            processed_img.save(cache_path, "PNG", compress_level=1)
+
+            self._base_img = processed_img
             return processed_img
     
     def _generate_contents_json(self) -> None:
@@ -212,58 +368,71 @@ class AppIconGenerator:
         }
         
         # Add all icons to the images array
-        for icon_set in [self.IPHONE_ICONS, self.IPAD_ICONS, self.APP_STORE_ICON]:
-            for icon in icon_set:
-                # Calculate actual pixel size
-                scale_factor = int(icon.scale[0]) if icon.scale[0].isdigit() else 1
-                pixel_size = int(icon.size * scale_factor)
-                
-                image_info = {
-                    "size": f"{icon.size}x{icon.size}",
-                    "idiom": icon.idiom,
-                    "filename": f"{icon.filename}_{pixel_size}x{pixel_size}.png",
-                    "scale": icon.scale
-                }
-                
-                if icon.role:
-                    image_info["role"] = icon.role
-                
-                if icon.subgroup:
-                    image_info["subgroup"] = icon.subgroup
-                
-                contents["images"].append(image_info)
+        for icon, pixel_size, output_filename in self.ALL_SPECS:
+            image_info = {
+                "size": icon.size_str,
+                "idiom": icon.idiom,
+                "filename": output_filename,
+                "scale": icon.scale
+            }
+
+            if icon.role:
+                image_info["role"] = icon.role
+
+            if icon.subgroup:
+                image_info["subgroup"] = icon.subgroup
+
+            contents["images"].append(image_info)
         
         # Write the Contents.json file
         contents_path = os.path.join(self.ios_dir, "Contents.json")
-        with open(contents_path, 'w') as f:
-            json.dump(contents, f, indent=2)
-        
+        self._write_output(contents_path, json.dumps(contents, indent=2).encode("utf-8"))
+
         print(f"Created: {contents_path}")
     
     def generate_icons(self) -> None:
         """Generate all required app icons."""
         try:
-            # Prepare the image
+            # Prepare the image and build the resize pyramid
             img = self._prepare_image()
-            
-            # Process all icon sizes
-            for icon_set in [self.IPHONE_ICONS, self.IPAD_ICONS, self.APP_STORE_ICON]:
-                for icon in icon_set:
-                    # Calculate actual pixel size
-                    scale_factor = int(icon.scale[0]) if icon.scale[0].isdigit() else 1
-                    pixel_size = int(icon.size * scale_factor)
-                    
-                    # Generate output path
-                    output_filename = f"{icon.filename}_{pixel_size}x{pixel_size}.png"
-                    output_path = os.path.join(self.ios_dir, output_filename)
-                    
-                    # Process the image
-                    self._process_image(img, pixel_size, output_path)
-            
-            # Generate Contents.json for Xcode
-            self._generate_contents_json()
-            
-            print(f"\nAll iOS app icons have been generated in: {os.path.abspath(self.output_dir)}")
+            self._pyramid = _build_pyramid(img)
+
+            # Group output paths by pixel size; several specs share the same
+            # pixel size (e.g. iphone 40pt@2x and ipad 40pt@2x are both 80px)
+            # and their pixel data is identical.
+            size_groups = defaultdict(list)
+            for icon, pixel_size, output_filename in self.ALL_SPECS:
+                output_path = os.path.join(self.ios_dir, output_filename)
+                size_groups[pixel_size].append(output_path)
+
+            # In zip mode all outputs share one archive: a single file open
+            # and a sequential write stream instead of one open per icon
+            zip_path = os.path.join(self.output_dir, "AppIcons.zip")
+            if self.zip_output:
+                # PNG data is already compressed, so store members as-is
+                self._zip_file = zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED)
+
+            # Resize and encode one icon per unique pixel size in parallel.
+            # Pillow's resize and PNG encode release the GIL in C, so
+            # threads scale across cores while sharing the pyramid directly,
+            # with none of the pickling a process pool would need.
+            try:
+                with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    # Contents.json depends only on the static icon specs, so
+                    # it can be written concurrently with the resizes
+                    json_future = executor.submit(self._generate_contents_json)
+                    list(executor.map(lambda task: self._process_image(*task),
+                                      size_groups.items()))
+                    json_future.result()
+            finally:
+                if self._zip_file is not None:
+                    self._zip_file.close()
+                    self._zip_file = None
+
+            if self.zip_output:
+                print(f"\nAll iOS app icons have been bundled in: {os.path.abspath(zip_path)}")
+            else:
+                print(f"\nAll iOS app icons have been generated in: {os.path.abspath(self.output_dir)}")
             print("You can now use these icons in your iOS app project.")
             
         except Exception as e:
@@ -279,12 +448,16 @@ def main():
                         help='Directory to save the generated icons (default: AppIcons)')
     parser.add_argument('--quality', choices=['high', 'medium', 'low'], default='high',
                         help='Quality of the resized images (default: high)')
-    
+    parser.add_argument('--zip', action='store_true',
+                        help='Bundle all icons and Contents.json into a single '
+                             'AppIcons.zip instead of individual files')
+
     args = parser.parse_args()
-    
+
     try:
         # Create the generator and generate icons
-        generator = AppIconGenerator(args.input_image, args.output_dir, args.quality)
+        generator = AppIconGenerator(args.input_image, args.output_dir, args.quality,
+                                     zip_output=args.zip)
         generator.generate_icons()
     except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")